@@ -1,41 +1,67 @@
+import datetime as dt
 import os
-from typing import Any, Dict, Optional, Tuple
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
-import firebase_admin
-import requests
 from flask import Flask, abort, jsonify, request
-from firebase_admin import auth, credentials
 
+import leaderboard
+from compression import init_compression
 from database import db, init_db
-from models import Follow, Match, UserProfile
+from models import Follow, Match, PlayerStats, UserProfile
+from rate_limit import enforce_rate_limit, init_rate_limiter
 
+# firebase_admin and requests pull in the google-cloud and urllib3 stacks, so
+# they are imported and initialized on first use rather than at app creation.
+_firebase_lock = threading.Lock()
 
-def create_app() -> Flask:
+
+def create_app(config: Optional[Mapping[str, Any]] = None) -> Flask:
     app = Flask(__name__)
 
     basedir = os.path.abspath(os.path.dirname(__file__))
     default_db_uri = "sqlite:///" + os.path.join(basedir, "netshots.db")
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL", default_db_uri)
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    if config:
+        app.config.update(config)
+
+    # The SDK itself loads lazily, but a misconfigured deploy should still fail at boot.
+    # Tools that never verify tokens (debug scripts, benchmarks) can turn this off.
+    if app.config.get("REQUIRE_FIREBASE_CREDENTIALS", True):
+        _firebase_credentials_path()
 
-    _configure_firebase()
     init_db(app)
+    init_rate_limiter(app)
+    init_compression(app)
+    leaderboard.init_leaderboard(app)
 
     register_routes(app)
     register_error_handlers(app)
     return app
 
 
-def _configure_firebase() -> None:
+def _firebase_auth():
+    """Return the firebase_admin auth module, initializing Firebase on first call."""
+    import firebase_admin
+    from firebase_admin import auth, credentials
+
     if firebase_admin._apps:
-        return
+        return auth
 
+    with _firebase_lock:
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(_firebase_credentials_path())
+            firebase_admin.initialize_app(cred)
+    return auth
+
+
+def _firebase_credentials_path() -> str:
     cred_path = os.getenv("FIREBASE_CREDENTIALS")
     if not cred_path or not os.path.exists(cred_path):
         raise RuntimeError("FIREBASE_CREDENTIALS env var must point to a service account JSON file")
+    return cred_path
 
-    cred = credentials.Certificate(cred_path)
-    firebase_admin.initialize_app(cred)
 
 def _fetch_weather_data(latitude: float, longitude: float, match_datetime: Any) -> Tuple[Optional[float], Optional[str]]:
 	"""Fetch weather data from OpenWeather API.
@@ -47,6 +73,8 @@ def _fetch_weather_data(latitude: float, longitude: float, match_datetime: Any)
 	if not api_key:
 		return None, None
 	
+	import requests  # deferred with firebase_admin, see the note at the top of the module
+	
 	try:
 		# Use OpenWeather One Call API or Current Weather API
 		# For historical data, we'd use Historical Weather API, but that requires paid plan
@@ -77,8 +105,13 @@ def register_error_handlers(app: Flask) -> None:
     @app.errorhandler(401)
     @app.errorhandler(404)
     @app.errorhandler(409)
+    @app.errorhandler(429)
     def handle_http_error(err):  # type: ignore[override]
-        return jsonify({"error": err.description if hasattr(err, "description") else str(err)}), err.code
+        response = jsonify({"error": err.description if hasattr(err, "description") else str(err)})
+        retry_after = getattr(err, "retry_after", None)
+        if retry_after:
+            response.headers["Retry-After"] = str(retry_after)
+        return response, err.code
 
     @app.errorhandler(Exception)
     def handle_unexpected(err):  # type: ignore[override]
@@ -97,18 +130,20 @@ def register_routes(app: Flask) -> None:
     @app.get("/api/profiles/me")
     def get_my_profile():
         uid, _ = _require_user()
-        profile = db.session.get(UserProfile, uid)
+        fields = _parse_fields(UserProfile.JSON_FIELDS)
+        profile = _get_profile(uid, fields)
         if not profile:
             abort(404, description="Profile not found")
-        return jsonify(profile.to_dict())
+        return jsonify(profile.to_dict(fields))
 
     @app.get("/api/profiles/<uid>")
     def get_profile(uid: str):
         _require_user()  # ensure token is valid even for public fetch
-        profile = db.session.get(UserProfile, uid)
+        fields = _parse_fields(UserProfile.JSON_FIELDS)
+        profile = _get_profile(uid, fields)
         if not profile:
             abort(404, description="Profile not found")
-        return jsonify(profile.to_dict())
+        return jsonify(profile.to_dict(fields))
 
     @app.post("/api/profiles")
     def create_or_update_profile():
@@ -153,8 +188,9 @@ def register_routes(app: Flask) -> None:
         if not profile:
             abort(404, description="Profile not found")
 
-        # Delete all associated matches first
+        # Delete all associated matches and their leaderboard rollup first
         Match.query.filter_by(user_id=uid).delete()
+        PlayerStats.query.filter_by(user_id=uid).delete()
         
         # Delete the profile
         db.session.delete(profile)
@@ -264,7 +300,15 @@ def register_routes(app: Flask) -> None:
         # Get limit and offset for pagination
         limit = request.args.get("limit", default=50, type=int)
         offset = request.args.get("offset", default=0, type=int)
-        
+
+        # fields= takes match keys plus "user.<key>" for the embedded user block;
+        # without any user.<key> the full user block is returned
+        fields = _parse_fields(list(Match.JSON_FIELDS) + [f"user.{key}" for key in FEED_USER_FIELDS])
+        match_fields = user_fields = None
+        if fields is not None:
+            match_fields = [f for f in fields if not f.startswith("user.")]
+            user_fields = [f[len("user."):] for f in fields if f.startswith("user.")] or None
+
         # Find all users the current user follows
         following = Follow.query.filter_by(follower_id=uid).all()
         following_ids = [f.following_id for f in following]
@@ -273,27 +317,35 @@ def register_routes(app: Flask) -> None:
             return jsonify([])
         
         # Get all matches from followed users, ordered by date (most recent first)
-        matches = Match.query.filter(
+        query = Match.query.filter(
             Match.user_id.in_(following_ids)
         ).order_by(
             Match.date.desc()
-        ).limit(limit).offset(offset).all()
-        
+        )
+        if match_fields is not None:
+            # userId is always read to attach the author's profile
+            query = query.options(Match.load_fields(set(match_fields) | {"userId"}))
+        matches = query.limit(limit).offset(offset).all()
+
+        # Load the authors of this page in one query, reading only the columns the user block needs
+        author_ids = {match.user_id for match in matches}
+        profiles = {
+            profile.uid: profile
+            for profile in UserProfile.query.options(
+                UserProfile.load_fields(_feed_profile_fields(user_fields))
+            ).filter(UserProfile.uid.in_(author_ids))
+        } if author_ids else {}
+
         # Enrich matches with user profile info
         feed_items = []
         for match in matches:
-            # Get the user profile for this match
-            profile = db.session.get(UserProfile, match.user_id)
+            profile = profiles.get(match.user_id)
             if not profile:
                 continue  # Skip if profile not found (shouldn't happen)
             
             feed_items.append({
-                "match": match.to_dict(),
-                "user": {
-                    "userId": profile.uid,
-                    "displayName": f"{profile.first_name} {profile.last_name}",
-                    "profilePicture": profile.profile_picture
-                }
+                "match": match.to_dict(match_fields),
+                "user": _feed_user(profile, user_fields),
             })
         
         return jsonify(feed_items)
@@ -302,14 +354,16 @@ def register_routes(app: Flask) -> None:
     @app.get("/api/matches")
     def get_my_matches():
         uid, _ = _require_user()
-        matches = Match.query.filter_by(user_id=uid).all()
-        return jsonify([m.to_dict() for m in matches])
+        fields = _parse_fields(Match.JSON_FIELDS)
+        matches = _matches_query(uid, fields).all()
+        return jsonify([m.to_dict(fields) for m in matches])
 
     @app.get("/api/matches/user/<uid>")
     def get_matches_for_user(uid: str):
         _require_user()  # any authenticated user can view other users' matches
-        matches = Match.query.filter_by(user_id=uid).all()
-        return jsonify([m.to_dict() for m in matches])
+        fields = _parse_fields(Match.JSON_FIELDS)
+        matches = _matches_query(uid, fields).all()
+        return jsonify([m.to_dict(fields) for m in matches])
 
     @app.post("/api/matches")
     def create_match():
@@ -342,6 +396,7 @@ def register_routes(app: Flask) -> None:
                 weather_description=weather_description
             )
             db.session.add(match)
+            leaderboard.record_match(match)
             db.session.commit()
         except ValueError as exc:
             db.session.rollback()
@@ -358,14 +413,34 @@ def register_routes(app: Flask) -> None:
         if match.user_id != uid:
             abort(403, description="Cannot delete a match you do not own")
 
+        # Read before deleting: a deleted instance can't load expired attributes
+        is_victory = match.is_victory
         db.session.delete(match)
+        leaderboard.remove_match(uid, is_victory)
         db.session.commit()
         return jsonify({"deleted": match_id})
 
+    # --- Leaderboard ---
+    @app.get("/api/leaderboard")
+    def get_global_leaderboard():
+        uid, _ = _require_user()
+        min_matches = request.args.get("minMatches", default=1, type=int)
+        return jsonify(_leaderboard_response(uid, leaderboard.global_players(min_matches), min_matches))
+
+    @app.get("/api/leaderboard/following")
+    def get_following_leaderboard():
+        uid, _ = _require_user()
+        min_matches = request.args.get("minMatches", default=1, type=int)
+        return jsonify(_leaderboard_response(uid, leaderboard.followed_players(uid, min_matches), min_matches))
+
     @app.route('/api/match-results/<user_id>', methods=['GET'])
     def get_match_results(user_id: str) -> Tuple[Dict[str, Any], int]:
-        matches = Match.query.filter_by(user_id=user_id).order_by(Match.date.asc()).all()  # Fetch matches ordered by date
-        results = [match.is_victory for match in matches] 
+        # No bearer token on this route, so the caller's IP is the rate limit key
+        enforce_rate_limit(f"ip:{request.remote_addr}")
+        # Only is_victory is selected so the query is answered from ix_matches_user_date_victory
+        query = db.session.query(Match.is_victory).filter(Match.user_id == user_id)
+        query = _apply_match_filters(query).order_by(Match.date.asc())  # Fetch matches ordered by date
+        results = [is_victory for (is_victory,) in query]
         return jsonify(results), 200
 
 
@@ -375,8 +450,9 @@ def _require_user() -> Tuple[str, str]:
         abort(401, description="Missing bearer token")
 
     token = auth_header.split(" ", 1)[1].strip()
+    firebase_auth = _firebase_auth()
     try:
-        decoded = auth.verify_id_token(token)
+        decoded = firebase_auth.verify_id_token(token)
     except Exception:
         abort(401, description="Invalid Firebase token")
 
@@ -384,6 +460,9 @@ def _require_user() -> Tuple[str, str]:
     email = decoded.get("email", "")
     if not uid:
         abort(401, description="Token missing uid")
+
+    # Runs before any route touches the database.
+    enforce_rate_limit(uid)
     return uid, email
 
 
@@ -394,12 +473,104 @@ def _get_payload() -> Dict[str, Any]:
     return payload
 
 
-def _generate_id() -> str:
-    return os.urandom(12).hex()
+def _parse_fields(allowed: Iterable[str]) -> Optional[List[str]]:
+    """Parse the comma-separated `fields` query parameter; None means all fields."""
+    raw = request.args.get("fields", "")
+    fields = [field.strip() for field in raw.split(",") if field.strip()]
+    if not fields:
+        return None
+
+    unknown = sorted(set(fields) - set(allowed))
+    if unknown:
+        abort(400, description=f"Unknown fields: {', '.join(unknown)}")
+    return fields
 
 
-app = create_app()
+def _get_profile(uid: str, fields: Optional[List[str]]) -> Optional[UserProfile]:
+    options = [UserProfile.load_fields(fields)] if fields is not None else None
+    return db.session.get(UserProfile, uid, options=options)
+
+
+def _matches_query(user_id: str, fields: Optional[List[str]]):
+    query = _apply_match_filters(Match.query.filter_by(user_id=user_id))
+    if fields is not None:
+        query = query.options(Match.load_fields(fields))
+    return query
+
+
+def _apply_match_filters(query):
+    """Apply the `from`/`to` date range and `isVictory` query parameters.
+
+    `from` is inclusive. A date-only `to` includes that whole day; a `to`
+    with a time of day is exclusive.
+    """
+    date_from = _parse_date_arg("from")
+    date_to = _parse_date_arg("to", end_of_day=True)
+    if date_from is not None:
+        query = query.filter(Match.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Match.date < date_to)
+
+    is_victory = request.args.get("isVictory")
+    if is_victory is not None:
+        if is_victory.lower() not in {"true", "false", "1", "0"}:
+            abort(400, description="isVictory must be true or false")
+        query = query.filter(Match.is_victory == (is_victory.lower() in {"true", "1"}))
+    return query
+
+
+def _parse_date_arg(name: str, *, end_of_day: bool = False) -> Optional[dt.datetime]:
+    """Parse an ISO date or datetime argument; with `end_of_day`, a bare date means midnight after it."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        abort(400, description=f"{name} must be an ISO date or datetime")
+    if end_of_day and "T" not in value and " " not in value:
+        parsed += dt.timedelta(days=1)
+    # Match dates are stored without a timezone
+    return parsed.replace(tzinfo=None)
+
+
+# Feed user key -> (UserProfile JSON fields it is built from, builder)
+FEED_USER_FIELDS = {
+    "userId": (("userId",), lambda profile: profile.uid),
+    "displayName": (("firstName", "lastName"), lambda profile: f"{profile.first_name} {profile.last_name}"),
+    "profilePicture": (("profilePicture",), lambda profile: profile.profile_picture),
+}
+
+
+def _feed_user(profile: UserProfile, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    # Only the requested keys are built so unloaded columns are never read.
+    keys = [key for key in FEED_USER_FIELDS if fields is None or key in fields]
+    return {key: FEED_USER_FIELDS[key][1](profile) for key in keys}
+
+
+def _feed_profile_fields(fields: Optional[List[str]]) -> List[str]:
+    """UserProfile fields to load for the feed user block; userId is always read to match authors."""
+    keys = FEED_USER_FIELDS if fields is None else fields
+    return sorted({"userId"}.union(*(FEED_USER_FIELDS[key][0] for key in keys)))
+
+
+def _leaderboard_response(uid: str, players, min_matches: int) -> Dict[str, Any]:
+    """Top entries of `players` (up to the `limit` query parameter) plus the caller's own entry and rank."""
+    limit = min(max(request.args.get("limit", default=20, type=int), 1), 100)
+    ranked = leaderboard.entries(leaderboard.top(players, limit))
+
+    me = next((entry for entry in ranked if entry["userId"] == uid), None)
+    if me is None:
+        stats = db.session.get(PlayerStats, uid)
+        if stats and stats.matches_played >= min_matches:
+            me = {**leaderboard.entries([stats])[0], "rank": leaderboard.rank_of(stats, players)}
+
+    return {"entries": ranked, "me": me}
+
+
+def _generate_id() -> str:
+    return os.urandom(12).hex()
 
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    create_app().run(debug=True, host="0.0.0.0", port=5000)
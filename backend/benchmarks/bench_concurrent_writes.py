@@ -0,0 +1,89 @@
+"""
+Concurrent writers benchmark: match creation throughput and latency under contention.
+Usage: python -m benchmarks.bench_concurrent_writes [--writers N] [--database-url URL] (from backend directory)
+
+Each writer thread plays a different player posting matches through
+POST /api/matches (which also updates the leaderboard rollup), while
+optional reader threads load the feed. Run it once on SQLite and once on
+PostgreSQL to compare SQLite's single-writer lock with row-level locking.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks.common import make_app, reset_schema, seed_users
+from database import db
+from models import Follow
+from testing import auth_headers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=200, help="matches posted by each writer")
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = args.database_url or "sqlite:///" + os.path.join(tmpdir, "bench.db")
+        app = make_app(database_url)
+        reset_schema(app)
+
+        writers = [f"writer-{i}" for i in range(args.writers)]
+        with app.app_context():
+            seed_users(writers + ["reader"])
+            db.session.add_all(Follow(follower_id="reader", following_id=uid) for uid in writers)
+            db.session.commit()
+
+        write_latencies, read_latencies, errors = [], [], []
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def write(uid):
+            client = app.test_client()
+            for i in range(args.requests):
+                payload = {"date": f"2025-01-01T10:{i // 60 % 60:02d}:{i % 60:02d}", "picture": "p", "isVictory": i % 2 == 0}
+                t0 = time.perf_counter()
+                response = client.post("/api/matches", json=payload, headers=auth_headers(uid))
+                elapsed = (time.perf_counter() - t0) * 1000
+                with lock:
+                    (write_latencies if response.status_code == 200 else errors).append(elapsed)
+
+        def read():
+            client = app.test_client()
+            while not done.is_set():
+                t0 = time.perf_counter()
+                client.get("/api/feed?limit=20", headers=auth_headers("reader"))
+                with lock:
+                    read_latencies.append((time.perf_counter() - t0) * 1000)
+
+        threads = [threading.Thread(target=write, args=(uid,)) for uid in writers]
+        readers = [threading.Thread(target=read) for _ in range(args.readers)]
+        started = time.perf_counter()
+        for thread in threads + readers:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        with app.app_context():
+            dialect = db.engine.dialect.name
+
+    print(f"\n{args.writers} writers x {args.requests} matches, {args.readers} feed readers on {dialect}")
+    print(f"write throughput: {len(write_latencies) / wall:.1f} matches/s ({len(errors)} failed)")
+    for name, samples in (("write", write_latencies), ("read", read_latencies)):
+        if len(samples) < 2:
+            continue
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+        print(f"{name} latency (ms): p50 {cuts[49]:.2f}  p95 {cuts[94]:.2f}  p99 {cuts[98]:.2f}  max {max(samples):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Match history benchmark: filtered vs unfiltered reads on a large history.
+Usage: python -m benchmarks.bench_match_filters [--matches N] [--database-url URL] (from backend directory)
+
+Seeds one player with a long history (plus other players so the index has
+to discriminate by user) and times the match list and match-results
+endpoints with and without the from/to/isVictory filters.
+"""
+import argparse
+import datetime as dt
+import os
+import tempfile
+
+from benchmarks.common import make_app, measure, print_table, reset_schema, seed_matches, seed_users
+from database import db
+from testing import auth_headers
+
+USER = "bench-player"
+START = dt.datetime(2015, 1, 1)
+SPAN_DAYS = 10 * 365
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, default=20000, help="matches in the benchmarked history")
+    parser.add_argument("--other-users", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = args.database_url or "sqlite:///" + os.path.join(tmpdir, "bench.db")
+        app = make_app(database_url)
+        reset_schema(app)
+
+        others = [f"other-{i}" for i in range(args.other_users)]
+        with app.app_context():
+            seed_users([USER] + others)
+            seed_matches(USER, args.matches, start=START, span_days=SPAN_DAYS)
+            for uid in others:
+                seed_matches(uid, args.matches // 10, start=START, span_days=SPAN_DAYS)
+
+        client = app.test_client()
+        headers = auth_headers(USER)
+        season = "from=2024-01-01&to=2025-01-01"
+
+        def get(url):
+            return lambda: client.get(url, headers=headers)
+
+        cases = {
+            "matches: all": get("/api/matches"),
+            "matches: one season": get(f"/api/matches?{season}"),
+            "matches: season, wins only": get(f"/api/matches?{season}&isVictory=true"),
+            "matches: season, 3 fields": get(f"/api/matches?{season}&fields=id,date,isVictory"),
+            "match-results: all": get(f"/api/match-results/{USER}"),
+            "match-results: one season": get(f"/api/match-results/{USER}?{season}"),
+            "match-results: season, losses": get(f"/api/match-results/{USER}?{season}&isVictory=false"),
+        }
+        results = {name: measure(fn, args.repeats) for name, fn in cases.items()}
+        print_table(f"{args.matches} matches for one player on {app.config['SQLALCHEMY_DATABASE_URI']}", results)
+
+        with app.app_context():
+            if db.engine.dialect.name == "sqlite":
+                plan = db.session.execute(db.text(
+                    "EXPLAIN QUERY PLAN SELECT is_victory FROM matches "
+                    "WHERE user_id = :uid AND date >= :start ORDER BY date"
+                ), {"uid": USER, "start": dt.datetime(2024, 1, 1)}).all()
+                print("\nmatch-results query plan: " + "; ".join(row[-1] for row in plan))
+
+
+if __name__ == "__main__":
+    main()
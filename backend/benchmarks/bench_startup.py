@@ -0,0 +1,90 @@
+"""
+Startup benchmark: import time, app construction and time-to-first-request.
+Usage: python -m benchmarks.bench_startup [--runs N] (from backend directory)
+
+Each run happens in a fresh interpreter so module caches do not hide the
+cold-start cost a recycled worker pays.
+
+Firebase is only loaded by the first authenticated request, so that cost is
+reported separately as "firebase_auth": with FIREBASE_CREDENTIALS set it
+times the full SDK import and initialization (app._firebase_auth()),
+otherwise only the SDK import.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in the child interpreter; prints one JSON line with the timings.
+CHILD_SCRIPT = """
+import json, os, sys, time
+has_credentials = bool(os.getenv("FIREBASE_CREDENTIALS"))
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+flask_app = app_module.create_app({"REQUIRE_FIREBASE_CREDENTIALS": has_credentials})
+t2 = time.perf_counter()
+response = flask_app.test_client().get("/api/health")
+t3 = time.perf_counter()
+assert response.status_code == 200, response.status_code
+firebase_loaded = "firebase_admin" in sys.modules
+requests_loaded = "requests" in sys.modules
+if has_credentials:
+    app_module._firebase_auth()
+else:
+    import firebase_admin.auth
+t4 = time.perf_counter()
+print(json.dumps({
+    "import": t1 - t0,
+    "create_app": t2 - t1,
+    "first_request": t3 - t2,
+    "firebase_auth": t4 - t3,
+    "total": t4 - t0,
+    "firebase_initialized": has_credentials,
+    "firebase_loaded": firebase_loaded,
+    "requests_loaded": requests_loaded,
+}))
+"""
+
+
+def run_once(database_url: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = args.database_url or "sqlite:///" + os.path.join(tmpdir, "bench.db")
+        runs = [run_once(database_url) for _ in range(args.runs)]
+
+    print(f"Startup over {args.runs} fresh interpreters (ms)")
+    print(f"{'phase':<15}{'min':>10}{'median':>10}{'max':>10}")
+    for phase in ("import", "create_app", "first_request", "firebase_auth", "total"):
+        values = [run[phase] * 1000 for run in runs]
+        print(f"{phase:<15}{min(values):>10.1f}{statistics.median(values):>10.1f}{max(values):>10.1f}")
+    if not runs[0]["firebase_initialized"]:
+        print("firebase_auth: FIREBASE_CREDENTIALS not set, SDK import only (no credential initialization)")
+    print(f"firebase_admin imported before first authenticated request: {any(r['firebase_loaded'] for r in runs)}")
+    print(f"requests imported before first weather lookup: {any(r['requests_loaded'] for r in runs)}")
+
+
+if __name__ == "__main__":
+    main()
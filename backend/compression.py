@@ -0,0 +1,58 @@
+import gzip
+
+from flask import Flask, Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/html"}
+
+
+def init_compression(app: Flask) -> None:
+    """Compress responses according to the client's Accept-Encoding.
+
+    Bodies smaller than COMPRESS_MIN_SIZE bytes are sent as-is, since the
+    encoding overhead outweighs the savings on tiny payloads.
+    """
+    app.config.setdefault("COMPRESS_MIN_SIZE", 1024)
+    app.config.setdefault("COMPRESS_GZIP_LEVEL", 6)
+    app.config.setdefault("COMPRESS_BROTLI_QUALITY", 4)
+    app.after_request(compress_response)
+
+
+def available_encodings() -> list:
+    """Encodings the server can produce, in order of preference."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress_response(response: Response) -> Response:
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    # The body may be compressed for other clients, so caches must key on the header.
+    response.vary.add("Accept-Encoding")
+
+    data = response.get_data()
+    if len(data) < current_app.config["COMPRESS_MIN_SIZE"]:
+        return response
+
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding == "br":
+        data = brotli.compress(data, quality=current_app.config["COMPRESS_BROTLI_QUALITY"])
+    elif encoding == "gzip":
+        data = gzip.compress(data, compresslevel=current_app.config["COMPRESS_GZIP_LEVEL"])
+    else:
+        return response
+
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    return response
@@ -1,11 +1,100 @@
+import os
+from typing import Any, Dict
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event, inspect, text
 
 # Shared SQLAlchemy instance for the Flask app.
 db = SQLAlchemy()
 
+# Indexes made redundant by newer ones (ix_matches_user_id is a prefix of
+# ix_matches_user_date_victory); dropped so writes stop maintaining them.
+OBSOLETE_INDEXES = ("ix_matches_user_id",)
+
+# Trigram indexes back the ILIKE '%term%' user search on PostgreSQL.
+event.listen(
+	db.metadata,
+	"before_create",
+	DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
 
 def init_db(app) -> None:
-	"""Attach the db to the app and create tables."""
+	"""Attach the db to the app and create tables.
+
+	Set AUTO_CREATE_TABLES to False to skip the schema check at startup
+	(e.g. for read-only tools or once the schema exists); `flask init-db`
+	creates the tables explicitly.
+	"""
+	uri = normalize_database_uri(app.config["SQLALCHEMY_DATABASE_URI"])
+	app.config["SQLALCHEMY_DATABASE_URI"] = uri
+	app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(uri))
+
 	db.init_app(app)
-	with app.app_context():
-		db.create_all()
+	app.cli.command("init-db")(_init_db_command)
+	if app.config.get("AUTO_CREATE_TABLES", True):
+		with app.app_context():
+			create_tables()
+
+
+def create_tables() -> None:
+	"""Create missing tables and indexes in the current app's database."""
+	db.create_all()
+	# create_all skips existing tables entirely, so indexes added to a model
+	# later would never reach an existing database without this pass.
+	for table in db.metadata.sorted_tables:
+		for index in table.indexes:
+			index.create(db.engine, checkfirst=True)
+	with db.engine.begin() as conn:
+		for name in OBSOLETE_INDEXES:
+			conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+		if conn.dialect.name == "postgresql":
+			_upgrade_postgres_columns(conn)
+
+
+def _init_db_command() -> None:
+	"""Create missing tables and indexes, then build the leaderboard rollup if it is empty."""
+	create_tables()
+	# Imported here because leaderboard depends on the models, which depend on this module.
+	from leaderboard import backfill_if_empty
+
+	backfill_if_empty()
+
+
+def _upgrade_postgres_columns(conn) -> None:
+	"""Convert user_profiles.pictures from the JSON-in-TEXT layout to JSONB in place."""
+	columns = {column["name"]: column["type"] for column in inspect(conn).get_columns("user_profiles")}
+	if columns["pictures"].__visit_name__.lower() == "text":
+		conn.execute(text(
+			"ALTER TABLE user_profiles ALTER COLUMN pictures TYPE jsonb "
+			"USING CASE WHEN pictures IS NULL OR pictures = '' THEN '[]'::jsonb ELSE pictures::jsonb END"
+		))
+
+
+def normalize_database_uri(uri: str) -> str:
+	"""Point driverless PostgreSQL URLs at psycopg 3 (requirements-postgres.txt).
+
+	Accepts the postgres:// scheme many hosts hand out, which SQLAlchemy does
+	not know; a bare postgresql:// would otherwise select psycopg2.
+	"""
+	for scheme in ("postgres://", "postgresql://"):
+		if uri.startswith(scheme):
+			return "postgresql+psycopg://" + uri[len(scheme):]
+	return uri
+
+
+def engine_options(uri: str) -> Dict[str, Any]:
+	"""Connection pool settings for server databases, tunable through DB_POOL_* env vars.
+
+	SQLite keeps SQLAlchemy's defaults: it has no server connections to pool.
+	"""
+	if uri.startswith("sqlite"):
+		return {}
+	return {
+		"pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+		"max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+		"pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+		# Drop connections closed by the server or a proxy before handing them out
+		"pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in {"true", "1", "yes"},
+		"pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+	}
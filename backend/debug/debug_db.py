@@ -1,6 +1,9 @@
 """
 Debug script to display database contents.
 Usage: python -m debug.debug_db (from backend directory)
+
+Rows are streamed rather than loaded all at once; for exports and quick
+statistics on large databases use debug.export_db instead.
 """
 import os
 import sys
@@ -12,20 +15,23 @@ from app import create_app
 from models import UserProfile, Match
 from database import db
 
+# Rows fetched per round trip while printing tables.
+STREAM_CHUNK_SIZE = 500
+
 
 def display_profiles():
     """Display all user profiles in the database."""
-    profiles = UserProfile.query.all()
+    profile_count = UserProfile.query.count()
     
     print("\n" + "="*80)
-    print(f"USER PROFILES ({len(profiles)} records)")
+    print(f"USER PROFILES ({profile_count} records)")
     print("="*80)
     
-    if not profiles:
+    if not profile_count:
         print("No profiles found.")
         return
     
-    for profile in profiles:
+    for profile in UserProfile.query.order_by(UserProfile.uid).yield_per(STREAM_CHUNK_SIZE):
         print(f"\nUID: {profile.uid}")
         print(f"  Email: {profile.email}")
         print(f"  Name: {profile.first_name} {profile.last_name}")
@@ -41,17 +47,17 @@ def display_profiles():
 
 def display_matches():
     """Display all matches in the database."""
-    matches = Match.query.all()
+    match_count = Match.query.count()
     
     print("\n" + "="*80)
-    print(f"MATCHES ({len(matches)} records)")
+    print(f"MATCHES ({match_count} records)")
     print("="*80)
     
-    if not matches:
+    if not match_count:
         print("No matches found.")
         return
     
-    for match in matches:
+    for match in Match.query.order_by(Match.id).yield_per(STREAM_CHUNK_SIZE):
         print(f"\nMatch ID: {match.id}")
         print(f"  User ID: {match.user_id}")
         print(f"  Victory: {match.is_victory}")
@@ -86,13 +92,13 @@ def display_stats():
 def main():
     """Main function to display all database contents."""
     # Create app context
-    app = create_app()
+    app = create_app({"AUTO_CREATE_TABLES": False, "REQUIRE_FIREBASE_CREDENTIALS": False})
     
     with app.app_context():
         print("\n" + "="*80)
         print("DATABASE DEBUG VIEWER")
         print("="*80)
-        print(f"Database: {app.config['SQLALCHEMY_DATABASE_URI']}")
+        print(f"Database: {db.engine.url.render_as_string(hide_password=True)}")
         
         display_stats()
         display_profiles()
@@ -0,0 +1,280 @@
+"""
+Streaming database export and inspection.
+Usage (from backend directory):
+    python -m debug.export_db export OUT_DIR [--format ndjson|csv] [--compress gzip|bz2|xz]
+                                             [--tables NAME ...] [--snapshot] [--resume]
+    python -m debug.export_db stats
+
+Tables are read in primary-key order, --chunk-size rows at a time, so memory
+use stays constant however large the database is. Each table goes to its own
+file in OUT_DIR. With compression every chunk is a separate gzip/bz2/xz
+stream, which the standard tools read back as one file.
+
+Progress is recorded in OUT_DIR/export_state.json after every chunk, so an
+interrupted export continues where it stopped with --resume. A resumed
+export keeps the saved --format, --compress, --tables and --snapshot
+settings and refuses conflicting ones; --chunk-size may be changed.
+
+--snapshot exports a consistent view of all tables: on SQLite it first copies
+the database with the online backup API (kept in OUT_DIR until the export
+completes, so resumed runs read the same copy); on PostgreSQL every table is
+read in one REPEATABLE READ, READ ONLY transaction. A resumed PostgreSQL
+export starts a new transaction and so a new snapshot.
+"""
+import argparse
+import bz2
+import csv
+import datetime as dt
+import enum
+import gzip
+import io
+import json
+import lzma
+import os
+import pathlib
+import sqlite3
+import sys
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select, tuple_
+
+from app import create_app
+from database import db
+from models import Match, UserProfile
+
+STATE_FILE = "export_state.json"
+SNAPSHOT_FILE = "snapshot.sqlite3"
+
+# --compress value -> (file suffix, compressor applied to each chunk)
+COMPRESSORS = {
+    "none": ("", None),
+    "gzip": (".gz", gzip.compress),
+    "bz2": (".bz2", bz2.compress),
+    "xz": (".xz", lzma.compress),
+}
+
+
+def export(out_dir, fmt=None, compress=None, tables=None, chunk_size=None, snapshot=None, resume=False):
+    """Export the selected tables (all by default) into `out_dir`.
+
+    Options left as None take their defaults, or the saved values when resuming.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    state_path = os.path.join(out_dir, STATE_FILE)
+
+    if os.path.exists(state_path):
+        if not resume:
+            raise SystemExit(f"{out_dir} already holds an export; pass --resume or choose another directory")
+        with open(state_path) as fh:
+            state = json.load(fh)
+        _check_resume_options(state, format=fmt, compress=compress, snapshot=snapshot)
+        if tables is not None and set(tables) != set(state["tables"]):
+            raise SystemExit(f"--tables does not match the export being resumed ({', '.join(state['tables'])})")
+        if chunk_size is not None and chunk_size != state["chunk_size"]:
+            print(f"Resuming with --chunk-size {chunk_size} instead of {state['chunk_size']}")
+            state["chunk_size"] = chunk_size
+    else:
+        fmt, compress, chunk_size = fmt or "ndjson", compress or "none", chunk_size or 1000
+        selected = [t.name for t in db.metadata.sorted_tables if not tables or t.name in tables]
+        unknown = set(tables or []) - set(selected)
+        if unknown:
+            raise SystemExit(f"Unknown tables: {', '.join(sorted(unknown))}")
+        state = {
+            "format": fmt,
+            "compress": compress,
+            "snapshot": bool(snapshot),
+            "chunk_size": chunk_size,
+            "tables": {name: {"last_key": None, "offset": 0, "rows": 0, "done": False} for name in selected},
+        }
+        _save_state(state_path, state)
+
+    engine = db.engine
+    if state["snapshot"] and engine.dialect.name == "sqlite":
+        engine = create_engine("sqlite:///" + _sqlite_snapshot(engine.url.database, out_dir))
+
+    with engine.connect() as conn:
+        if state["snapshot"] and engine.dialect.name == "postgresql":
+            conn = conn.execution_options(isolation_level="REPEATABLE READ", postgresql_readonly=True)
+
+        for name, entry in state["tables"].items():
+            if entry["done"]:
+                continue
+            table = db.metadata.tables[name]
+            suffix, _ = COMPRESSORS[state["compress"]]
+            path = os.path.join(out_dir, f"{name}.{state['format']}{suffix}")
+            _export_table(conn, table, path, entry, state, state_path, state["chunk_size"])
+            print(f"{name}: {entry['rows']} rows -> {path}")
+        conn.rollback()
+
+    if engine is not db.engine:
+        engine.dispose()
+        os.remove(os.path.join(out_dir, SNAPSHOT_FILE))
+
+
+def _check_resume_options(state, **options):
+    for name, value in options.items():
+        if value is not None and value != state[name]:
+            raise SystemExit(f"--{name} {value} does not match the export being resumed ({state[name]})")
+
+
+def _export_table(conn, table, path, entry, state, state_path, chunk_size):
+    pk = list(table.primary_key.columns)
+    columns = [column.name for column in table.columns]
+    _, compressor = COMPRESSORS[state["compress"]]
+    # Keep the snapshot transaction open across chunks; otherwise end each
+    # chunk's read transaction so a long export doesn't hold locks.
+    single_transaction = state["snapshot"] and conn.dialect.name != "sqlite"
+
+    with open(path, "r+b" if os.path.exists(path) else "wb") as out:
+        # Drop anything written after the last recorded chunk of an interrupted run
+        out.truncate(entry["offset"])
+        out.seek(entry["offset"])
+
+        while True:
+            query = select(table).order_by(*pk).limit(chunk_size)
+            if entry["last_key"] is not None:
+                query = query.where(tuple_(*pk) > tuple_(*entry["last_key"]))
+            rows = conn.execute(query).all()
+            if not single_transaction:
+                conn.rollback()
+            if not rows:
+                break
+
+            _write_chunk(out, _encode_rows(rows, columns, state["format"], header=entry["offset"] == 0), compressor)
+            last = rows[-1]._mapping
+            entry["last_key"] = [_plain(last[column.name]) for column in pk]
+            entry["offset"] = out.tell()
+            entry["rows"] += len(rows)
+            _save_state(state_path, state)
+
+        if entry["offset"] == 0:
+            # Empty table: still emit the CSV header, and a valid (empty) compressed stream
+            _write_chunk(out, _encode_rows([], columns, state["format"], header=True), compressor)
+            entry["offset"] = out.tell()
+
+    entry["done"] = True
+    _save_state(state_path, state)
+
+
+def _write_chunk(out, data, compressor):
+    if compressor:
+        data = compressor(data)
+    out.write(data)
+    out.flush()
+    os.fsync(out.fileno())
+
+
+def _encode_rows(rows, columns, fmt, header):
+    if fmt == "ndjson":
+        lines = (json.dumps({c: _plain(v) for c, v in zip(columns, row)}, ensure_ascii=False) for row in rows)
+        return "".join(line + "\n" for line in lines).encode("utf-8")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    for row in rows:
+        writer.writerow([json.dumps(v) if isinstance(v, list) else _plain(v) for v in row])
+    return buffer.getvalue().encode("utf-8")
+
+
+def _plain(value):
+    """Convert column values to JSON-friendly types."""
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _sqlite_snapshot(database_path, out_dir):
+    path = os.path.join(out_dir, SNAPSHOT_FILE)
+    if not os.path.exists(path):
+        partial = path + ".partial"
+        # as_uri() percent-encodes characters such as ? # % that would end the path early
+        source = sqlite3.connect(pathlib.Path(database_path).resolve().as_uri() + "?mode=ro", uri=True)
+        target = sqlite3.connect(partial)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        os.replace(partial, path)
+    return path
+
+
+def _save_state(state_path, state):
+    partial = state_path + ".partial"
+    with open(partial, "w") as fh:
+        json.dump(state, fh, indent=2)
+    os.replace(partial, state_path)
+
+
+def print_stats():
+    """Print table sizes and match aggregates computed in SQL, without loading rows."""
+    print("\n" + "=" * 80)
+    print("DATABASE STATISTICS")
+    print("=" * 80)
+    for table in db.metadata.sorted_tables:
+        count = db.session.execute(select(func.count()).select_from(table)).scalar_one()
+        print(f"{table.name + ':':<16}{count} rows")
+
+    matches, victories, players, first, last = db.session.execute(
+        select(
+            func.count(Match.id),
+            func.coalesce(func.sum(db.case((Match.is_victory, 1), else_=0)), 0),
+            func.count(func.distinct(Match.user_id)),
+            func.min(Match.date),
+            func.max(Match.date),
+        )
+    ).one()
+    print(f"\nMatches: {matches} by {players} players ({victories} victories, {matches - victories} losses)")
+    if matches:
+        print(f"Match dates: {first} .. {last}")
+
+    profile_victories, profile_losses = db.session.execute(
+        select(func.coalesce(func.sum(UserProfile.victories), 0), func.coalesce(func.sum(UserProfile.losses), 0))
+    ).one()
+    print(f"Profile counters: {profile_victories} victories, {profile_losses} losses")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="stream tables to NDJSON or CSV files")
+    export_parser.add_argument("out_dir")
+    # None defaults let a resumed export tell options given explicitly from omitted ones
+    export_parser.add_argument("--format", choices=["ndjson", "csv"], help="default: ndjson")
+    export_parser.add_argument("--compress", choices=list(COMPRESSORS), help="default: none")
+    export_parser.add_argument("--tables", nargs="+", help="defaults to every table")
+    export_parser.add_argument("--chunk-size", type=int, help="rows per query, default: 1000")
+    export_parser.add_argument(
+        "--snapshot", action="store_true", default=None, help="export a consistent view of all tables"
+    )
+    export_parser.add_argument("--resume", action="store_true", help="continue an interrupted export in OUT_DIR")
+
+    commands.add_parser("stats", help="print aggregate statistics")
+    args = parser.parse_args()
+
+    app = create_app({"AUTO_CREATE_TABLES": False, "REQUIRE_FIREBASE_CREDENTIALS": False})
+    with app.app_context():
+        print(f"Database: {db.engine.url.render_as_string(hide_password=True)}")
+        if args.command == "stats":
+            print_stats()
+        else:
+            export(
+                args.out_dir,
+                fmt=args.format,
+                compress=args.compress,
+                tables=args.tables,
+                chunk_size=args.chunk_size,
+                snapshot=args.snapshot,
+                resume=args.resume,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import datetime as dt
+from typing import Any, Dict, List, Tuple
+
+import click
+from flask import Flask
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Query
+
+from database import db
+from models import Follow, Match, PlayerStats, UserProfile
+
+# Number of latest matches summarized in PlayerStats.recent_form.
+RECENT_FORM_SIZE = 5
+
+# Best first; matches the column order of ix_player_stats_ranking.
+RANKING_ORDER = (PlayerStats.win_rate.desc(), PlayerStats.victories.desc(), PlayerStats.matches_played.desc())
+
+
+def init_leaderboard(app: Flask) -> None:
+    """Register `flask refresh-leaderboard` for the periodic full rebuild."""
+    app.cli.command("refresh-leaderboard")(_refresh_command)
+
+
+def _refresh_command() -> None:
+    """Recompute every player's leaderboard aggregates from the matches table."""
+    click.echo(f"Refreshed leaderboard for {refresh_all()} players")
+
+
+def backfill_if_empty() -> None:
+    """Build the rollup table on first deploy, when matches exist but no aggregates do yet.
+
+    Run by `flask init-db`, once per deploy rather than in every worker.
+    """
+    has_stats = db.session.query(PlayerStats.user_id).first() is not None
+    if not has_stats and db.session.query(Match.id).first() is not None:
+        refresh_all()
+
+
+def record_match(match: Match) -> None:
+    """Fold a newly added match into its player's aggregates. The caller commits."""
+    _apply_delta(match.user_id, matches=1, victories=int(bool(match.is_victory)))
+
+
+def remove_match(user_id: str, is_victory: bool) -> None:
+    """Take a match the caller has just deleted out of its player's aggregates. The caller commits."""
+    _apply_delta(user_id, matches=-1, victories=-int(bool(is_victory)))
+
+
+def _apply_delta(user_id: str, *, matches: int, victories: int) -> None:
+    db.session.flush()  # the recent form query must see the pending insert/delete
+
+    # Increment in SQL so concurrent writers for the same player don't lose updates.
+    new_matches = PlayerStats.matches_played + matches
+    new_victories = PlayerStats.victories + victories
+    changes = {
+        "matches_played": new_matches,
+        "victories": new_victories,
+        "win_rate": db.case((new_matches > 0, new_victories * 1.0 / new_matches), else_=0.0),
+        "recent_form": _recent_form(user_id),
+        "updated_at": dt.datetime.utcnow(),
+    }
+    result = db.session.execute(db.update(PlayerStats).where(PlayerStats.user_id == user_id).values(**changes))
+    if result.rowcount == 0:
+        # No rollup row yet (first match, or history predating the rollup table)
+        _insert_player(user_id, on_conflict=changes)
+    if matches < 0:
+        # Like refresh_all, keep no row for players without matches
+        db.session.execute(
+            db.delete(PlayerStats).where(PlayerStats.user_id == user_id, PlayerStats.matches_played <= 0)
+        )
+
+
+def _insert_player(user_id: str, *, on_conflict: Dict[str, Any]) -> None:
+    """Insert the player's row computed from their matches.
+
+    A concurrent first match for the same player may insert the row after our
+    UPDATE found nothing; the conflict then applies `on_conflict` to that row
+    instead of failing on the primary key.
+    """
+    matches_played, victories = _player_totals(user_id)
+    if matches_played == 0:
+        return
+
+    insert = postgresql.insert if db.session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    db.session.execute(
+        insert(PlayerStats)
+        .values(
+            user_id=user_id,
+            matches_played=matches_played,
+            victories=victories,
+            win_rate=victories / matches_played,
+            recent_form=on_conflict["recent_form"],
+            updated_at=on_conflict["updated_at"],
+        )
+        .on_conflict_do_update(index_elements=[PlayerStats.user_id], set_=on_conflict)
+    )
+
+
+def _player_totals(user_id: str) -> Tuple[int, int]:
+    return db.session.query(
+        db.func.count(Match.id), db.func.coalesce(db.func.sum(db.case((Match.is_victory, 1), else_=0)), 0)
+    ).filter(Match.user_id == user_id).one()
+
+
+def refresh_all() -> int:
+    """Rebuild the whole rollup table in one transaction; returns the number of players."""
+    # Hold off incremental updates until the rebuild commits, so none can land
+    # between reading the totals and replacing the rows. PostgreSQL still
+    # serves leaderboard reads meanwhile; on SQLite the DELETE takes the
+    # database write lock before anything is read.
+    if db.session.get_bind().dialect.name == "postgresql":
+        db.session.execute(db.text("LOCK TABLE player_stats IN EXCLUSIVE MODE"))
+    db.session.execute(db.delete(PlayerStats))
+
+    totals = db.session.query(
+        Match.user_id,
+        db.func.count(Match.id),
+        db.func.sum(db.case((Match.is_victory, 1), else_=0)),
+    ).group_by(Match.user_id)
+
+    # Latest RECENT_FORM_SIZE outcomes per player in a single pass
+    position = db.func.row_number().over(partition_by=Match.user_id, order_by=Match.date.desc()).label("position")
+    latest = db.session.query(Match.user_id, Match.is_victory, position).subquery()
+    forms: Dict[str, str] = {}
+    for user_id, is_victory, _ in db.session.query(latest).filter(
+        latest.c.position <= RECENT_FORM_SIZE
+    ).order_by(latest.c.user_id, latest.c.position):
+        forms[user_id] = forms.get(user_id, "") + ("W" if is_victory else "L")
+
+    now = dt.datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "matches_played": matches_played,
+            "victories": victories,
+            "win_rate": victories / matches_played,
+            "recent_form": forms.get(user_id, ""),
+            "updated_at": now,
+        }
+        for user_id, matches_played, victories in totals
+    ]
+
+    if rows:
+        db.session.execute(db.insert(PlayerStats), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def global_players(min_matches: int = 1) -> Query:
+    """Every player with at least `min_matches` matches."""
+    return PlayerStats.query.filter(PlayerStats.matches_played >= min_matches)
+
+
+def followed_players(uid: str, min_matches: int = 1) -> Query:
+    """`uid` and the players they follow, with at least `min_matches` matches."""
+    followed = db.select(Follow.following_id).where(Follow.follower_id == uid)
+    return global_players(min_matches).filter(
+        db.or_(PlayerStats.user_id == uid, PlayerStats.user_id.in_(followed))
+    )
+
+
+def top(players: Query, limit: int) -> List[PlayerStats]:
+    """Best `limit` players of `players`, read in index order."""
+    return players.order_by(*RANKING_ORDER).limit(limit).all()
+
+
+def rank_of(stats: PlayerStats, players: Query) -> int:
+    """Competition rank ("1224") of `stats` among `players`."""
+    better = db.or_(
+        PlayerStats.win_rate > stats.win_rate,
+        db.and_(PlayerStats.win_rate == stats.win_rate, PlayerStats.victories > stats.victories),
+        db.and_(
+            PlayerStats.win_rate == stats.win_rate,
+            PlayerStats.victories == stats.victories,
+            PlayerStats.matches_played > stats.matches_played,
+        ),
+    )
+    return players.filter(better).count() + 1
+
+
+def entries(ranked: List[PlayerStats]) -> List[Dict[str, Any]]:
+    """Serialize stats already in ranking order, with competition ranks and display info."""
+    profiles = {
+        profile.uid: profile
+        for profile in UserProfile.query.options(
+            UserProfile.load_fields(["userId", "firstName", "lastName", "profilePicture"])
+        ).filter(UserProfile.uid.in_([stats.user_id for stats in ranked]))
+    } if ranked else {}
+
+    results = []
+    rank, previous_key = 0, None
+    for position, stats in enumerate(ranked, start=1):
+        key = (stats.win_rate, stats.victories, stats.matches_played)
+        if key != previous_key:
+            rank, previous_key = position, key
+        profile = profiles.get(stats.user_id)
+        results.append({
+            "rank": rank,
+            "displayName": f"{profile.first_name} {profile.last_name}" if profile else None,
+            "profilePicture": profile.profile_picture if profile else None,
+            **stats.to_dict(),
+        })
+    return results
+
+
+def _recent_form(user_id: str) -> str:
+    # Walks ix_matches_user_date_victory backwards, so the cost is independent of history length.
+    outcomes = db.session.query(Match.is_victory).filter(
+        Match.user_id == user_id
+    ).order_by(Match.date.desc()).limit(RECENT_FORM_SIZE)
+    return "".join("W" if is_victory else "L" for (is_victory,) in outcomes)
@@ -4,6 +4,8 @@ import json
 from typing import Any, Dict, Iterable, List, Optional
 
 from sqlalchemy import Float, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import load_only
 from sqlalchemy.types import TypeDecorator
 
 from database import db
@@ -16,17 +18,25 @@ class Gender(enum.Enum):
 
 
 class StringList(TypeDecorator):
-	"""Store Python lists as JSON strings in a TEXT column."""
+	"""Store Python lists as JSONB on PostgreSQL and as JSON strings in a TEXT column elsewhere."""
 
 	impl = Text
 	cache_ok = True
 
-	def process_bind_param(self, value: Optional[Iterable[str]], dialect) -> str:
-		if value is None:
-			return json.dumps([])
-		return json.dumps(list(value))
+	def load_dialect_impl(self, dialect):
+		if dialect.name == "postgresql":
+			return dialect.type_descriptor(JSONB())
+		return dialect.type_descriptor(Text())
 
-	def process_result_value(self, value: Optional[str], dialect) -> List[str]:
+	def process_bind_param(self, value: Optional[Iterable[str]], dialect) -> Any:
+		items = [] if value is None else list(value)
+		if dialect.name == "postgresql":
+			return items
+		return json.dumps(items)
+
+	def process_result_value(self, value: Any, dialect) -> List[str]:
+		if isinstance(value, list):
+			return value
 		if not value:
 			return []
 		try:
@@ -38,6 +48,16 @@ class StringList(TypeDecorator):
 
 class UserProfile(db.Model):
 	__tablename__ = "user_profiles"
+	# PostgreSQL only: trigram GIN indexes so the name search's ILIKE '%q%' avoids a sequential scan.
+	__table_args__ = tuple(
+		db.Index(
+			f"ix_user_profiles_{column}_trgm",
+			column,
+			postgresql_using="gin",
+			postgresql_ops={column: "gin_trgm_ops"},
+		).ddl_if(dialect="postgresql")
+		for column in ("first_name", "last_name")
+	)
 
 	# Firebase UID is the primary key to align with Firebase Auth.
 	uid = db.Column(db.String(128), primary_key=True)
@@ -55,20 +75,28 @@ class UserProfile(db.Model):
 		db.DateTime, nullable=False, default=dt.datetime.utcnow, onupdate=dt.datetime.utcnow
 	)
 
-	def to_dict(self) -> Dict[str, Any]:
-		"""Map to the contract expected by the Flutter model."""
-		return {
-			"userId": self.uid,
-			"email": self.email,
-			"firstName": self.first_name,
-			"lastName": self.last_name,
-			"birthDate": self.birth_date.isoformat(),
-			"gender": self.gender.value,
-			"profilePicture": self.profile_picture,
-			"victories": self.victories,
-			"losses": self.losses,
-			"pictures": list(self.pictures or []),
-		}
+	# JSON key -> (column attribute, serializer); drives to_dict and sparse field selection.
+	JSON_FIELDS = {
+		"userId": ("uid", None),
+		"email": ("email", None),
+		"firstName": ("first_name", None),
+		"lastName": ("last_name", None),
+		"birthDate": ("birth_date", lambda value: value.isoformat()),
+		"gender": ("gender", lambda value: value.value),
+		"profilePicture": ("profile_picture", None),
+		"victories": ("victories", None),
+		"losses": ("losses", None),
+		"pictures": ("pictures", lambda value: list(value or [])),
+	}
+
+	def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+		"""Map to the contract expected by the Flutter model, optionally limited to `fields`."""
+		return _serialize(self, self.JSON_FIELDS, fields)
+
+	@classmethod
+	def load_fields(cls, fields: Iterable[str]):
+		"""Loader option that only reads the columns backing `fields`."""
+		return _load_fields(cls, fields)
 
 	@classmethod
 	def from_payload(
@@ -136,9 +164,12 @@ class Follow(db.Model):
 
 class Match(db.Model):
 	__tablename__ = "matches"
+	# Covers per-user history and stats queries: filters on user and date
+	# range, and is_victory is read straight from the index.
+	__table_args__ = (db.Index("ix_matches_user_date_victory", "user_id", "date", "is_victory"),)
 
 	id = db.Column(db.String(128), primary_key=True)
-	user_id = db.Column(db.String(128), db.ForeignKey("user_profiles.uid"), nullable=False, index=True)
+	user_id = db.Column(db.String(128), db.ForeignKey("user_profiles.uid"), nullable=False)
 	is_victory = db.Column(db.Boolean, nullable=False, default=False)
 	date = db.Column(db.DateTime, nullable=False)
 	picture = db.Column(db.String(1024), nullable=False)
@@ -151,19 +182,25 @@ class Match(db.Model):
 
 	user = db.relationship("UserProfile", backref=db.backref("matches", lazy=True))
 
-	def to_dict(self) -> Dict[str, Any]:
-		return {
-			"id": self.id,
-			"userId": self.user_id,
-			"isVictory": self.is_victory,
-			"date": self.date.isoformat(),
-			"picture": self.picture,
-			"notes": self.notes,
-			"latitude": self.latitude,
-			"longitude": self.longitude,
-			"temperature": self.temperature,
-			"weatherDescription": self.weather_description,
-		}
+	JSON_FIELDS = {
+		"id": ("id", None),
+		"userId": ("user_id", None),
+		"isVictory": ("is_victory", None),
+		"date": ("date", lambda value: value.isoformat()),
+		"picture": ("picture", None),
+		"notes": ("notes", None),
+		"latitude": ("latitude", None),
+		"longitude": ("longitude", None),
+		"temperature": ("temperature", None),
+		"weatherDescription": ("weather_description", None),
+	}
+
+	def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+		return _serialize(self, self.JSON_FIELDS, fields)
+
+	@classmethod
+	def load_fields(cls, fields: Iterable[str]):
+		return _load_fields(cls, fields)
 
 	@classmethod
 	def from_payload(cls, *, payload: Dict[str, Any], user_id: str, match_id: str, temperature: Optional[float] = None, weather_description: Optional[str] = None) -> "Match":
@@ -201,6 +238,56 @@ class Match(db.Model):
 			self.longitude = _parse_optional_float(payload.get("longitude"))
 
 
+class PlayerStats(db.Model):
+	"""Per-player match aggregates backing the leaderboards; maintained by leaderboard.py."""
+
+	__tablename__ = "player_stats"
+	# Scanned backwards for "ORDER BY win_rate DESC, victories DESC, matches_played DESC LIMIT n".
+	__table_args__ = (db.Index("ix_player_stats_ranking", "win_rate", "victories", "matches_played"),)
+
+	user_id = db.Column(db.String(128), db.ForeignKey("user_profiles.uid"), primary_key=True)
+	matches_played = db.Column(db.Integer, nullable=False, default=0)
+	victories = db.Column(db.Integer, nullable=False, default=0)
+	win_rate = db.Column(Float, nullable=False, default=0.0)
+	# Outcomes of the latest matches, most recent first: "W" or "L" per match.
+	recent_form = db.Column(db.String(16), nullable=False, default="")
+	updated_at = db.Column(
+		db.DateTime, nullable=False, default=dt.datetime.utcnow, onupdate=dt.datetime.utcnow
+	)
+
+	user = db.relationship("UserProfile", backref=db.backref("stats", lazy=True, uselist=False))
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+			"userId": self.user_id,
+			"matchesPlayed": self.matches_played,
+			"victories": self.victories,
+			"losses": self.matches_played - self.victories,
+			"winRate": self.win_rate,
+			"recentForm": [outcome == "W" for outcome in self.recent_form],
+		}
+
+
+def _serialize(obj: Any, json_fields: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+	# Only the requested attributes are touched so deferred columns are never loaded.
+	if fields is None:
+		keys = list(json_fields)
+	else:
+		wanted = set(fields)
+		keys = [key for key in json_fields if key in wanted]
+	data = {}
+	for key in keys:
+		attribute, serializer = json_fields[key]
+		value = getattr(obj, attribute)
+		data[key] = serializer(value) if serializer and value is not None else value
+	return data
+
+
+def _load_fields(model: Any, fields: Iterable[str]):
+	columns = [getattr(model, model.JSON_FIELDS[key][0]) for key in fields]
+	return load_only(*columns)
+
+
 def _parse_birth_date(value: Any) -> dt.date:
 	if isinstance(value, dt.date):
 		return value
@@ -0,0 +1,165 @@
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional, Tuple, Union
+
+from flask import Flask, abort, current_app, request
+from werkzeug.utils import import_string
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Token bucket refilled at `rate` tokens per second, holding at most `capacity`."""
+
+    rate: float
+    capacity: float
+
+
+# Fallback budgets for routes without an explicit entry.
+DEFAULT_USER_BUDGET = Budget(rate=5.0, capacity=30)
+DEFAULT_GLOBAL_BUDGET = Budget(rate=100.0, capacity=200)
+
+# Per-route budgets keyed by Flask endpoint name.
+USER_BUDGETS: Dict[str, Budget] = {
+    "get_feed": Budget(rate=0.5, capacity=10),
+    "search_users": Budget(rate=2.0, capacity=15),  # search-as-you-type
+    "create_match": Budget(rate=0.2, capacity=10),  # also calls OpenWeather
+    "create_or_update_profile": Budget(rate=0.5, capacity=10),
+    "update_my_profile": Budget(rate=0.5, capacity=10),
+    "delete_my_profile": Budget(rate=0.1, capacity=3),
+    # Unauthenticated, so keyed by client IP; scans a user's whole history
+    "get_match_results": Budget(rate=1.0, capacity=20),
+}
+GLOBAL_BUDGETS: Dict[str, Budget] = {
+    "get_feed": Budget(rate=50.0, capacity=100),
+    "search_users": Budget(rate=50.0, capacity=100),
+    "create_match": Budget(rate=20.0, capacity=40),
+    "get_match_results": Budget(rate=50.0, capacity=100),
+}
+
+
+class RateLimitBackend(ABC):
+    """Storage for bucket state.
+
+    Subclasses must make `take` atomic per key. The in-process backend is
+    enough for a single worker; for multi-process deployments implement this
+    interface on a shared store (e.g. a Redis Lua script doing the same
+    refill-and-take arithmetic) and select it with RATE_LIMIT_BACKEND.
+    """
+
+    @abstractmethod
+    def take(self, key: str, budget: Budget, cost: float = 1.0) -> float:
+        """Consume `cost` tokens from the bucket stored at `key`.
+
+        Returns 0 when the tokens were granted, otherwise the number of
+        seconds until enough tokens will have been refilled.
+        """
+
+
+class MemoryBackend(RateLimitBackend):
+    """Buckets held in process memory. Limits apply per worker process.
+
+    At most `max_keys` buckets are kept; beyond that the least recently used
+    one is evicted, which at worst hands an idle client a fresh bucket.
+    """
+
+    def __init__(self, max_keys: int = 10000, clock: Callable[[], float] = time.monotonic) -> None:
+        # key -> (tokens, last refill timestamp), least recently used first
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+        self._clock = clock
+
+    def take(self, key: str, budget: Budget, cost: float = 1.0) -> float:
+        with self._lock:
+            now = self._clock()
+            state = self._buckets.get(key)
+            if state is None:
+                tokens = budget.capacity
+            else:
+                tokens = min(budget.capacity, state[0] + (now - state[1]) * budget.rate)
+
+            granted = tokens >= cost
+            if granted:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+
+            if granted:
+                return 0.0
+            return (cost - tokens) / budget.rate
+
+
+class RateLimiter:
+    """Applies a per-user bucket and a shared global bucket to each route."""
+
+    def __init__(
+        self,
+        backend: Optional[RateLimitBackend] = None,
+        user_budgets: Optional[Mapping[str, Budget]] = None,
+        global_budgets: Optional[Mapping[str, Budget]] = None,
+        default_user_budget: Budget = DEFAULT_USER_BUDGET,
+        default_global_budget: Budget = DEFAULT_GLOBAL_BUDGET,
+    ) -> None:
+        self.backend = backend or MemoryBackend()
+        self.user_budgets = dict(USER_BUDGETS if user_budgets is None else user_budgets)
+        self.global_budgets = dict(GLOBAL_BUDGETS if global_budgets is None else global_budgets)
+        self.default_user_budget = default_user_budget
+        self.default_global_budget = default_global_budget
+
+    def check(self, endpoint: str, uid: str) -> float:
+        """Return 0 if the request may proceed, else the seconds to wait."""
+        # The user's own bucket goes first so that a client which is already
+        # over its budget cannot drain the global bucket for everyone else.
+        user_budget = self.user_budgets.get(endpoint, self.default_user_budget)
+        wait = self.backend.take(f"user:{uid}:{endpoint}", user_budget)
+        if wait:
+            return wait
+
+        global_budget = self.global_budgets.get(endpoint, self.default_global_budget)
+        return self.backend.take(f"global:{endpoint}", global_budget)
+
+
+def init_rate_limiter(app: Flask, backend: Optional[RateLimitBackend] = None) -> None:
+    """Attach a rate limiter to the app unless RATE_LIMIT_ENABLED is false.
+
+    The bucket store is `backend` if given, else RATE_LIMIT_BACKEND: a
+    RateLimitBackend instance or the import path of a subclass to
+    instantiate (e.g. "mypackage.limits:RedisBackend"). The default keeps
+    buckets in process memory.
+    """
+    enabled = app.config.get("RATE_LIMIT_ENABLED", os.getenv("RATE_LIMIT_ENABLED", "true"))
+    if str(enabled).lower() in {"false", "0", "no"}:
+        return
+    if backend is None:
+        backend = _configured_backend(app.config.get("RATE_LIMIT_BACKEND", os.getenv("RATE_LIMIT_BACKEND")))
+    app.extensions["rate_limiter"] = RateLimiter(backend=backend)
+
+
+def _configured_backend(setting: Union[RateLimitBackend, str, None]) -> Optional[RateLimitBackend]:
+    if setting is None or isinstance(setting, RateLimitBackend):
+        return setting
+    backend = import_string(setting)()
+    if not isinstance(backend, RateLimitBackend):
+        raise TypeError(f"RATE_LIMIT_BACKEND {setting!r} is not a RateLimitBackend")
+    return backend
+
+
+def enforce_rate_limit(uid: str) -> None:
+    """Abort with 429 and Retry-After when `uid` is over budget for the current route.
+
+    `uid` is any stable client key; unauthenticated routes pass the client IP.
+    """
+    limiter: Optional[RateLimiter] = current_app.extensions.get("rate_limiter")
+    if limiter is None or request.endpoint is None:
+        return
+
+    wait = limiter.check(request.endpoint, uid)
+    if wait:
+        abort(429, description="Too many requests", retry_after=max(1, math.ceil(wait)))
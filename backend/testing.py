@@ -0,0 +1,31 @@
+"""Helpers shared by the test suite and the benchmarks for apps that skip Firebase."""
+from typing import Any, Dict
+
+
+class FakeFirebaseAuth:
+    """Accepts any bearer token and treats it as the uid."""
+
+    @staticmethod
+    def verify_id_token(token: str) -> Dict[str, str]:
+        return {"uid": token, "email": f"{token}@test.local"}
+
+
+def fake_firebase_auth() -> Any:
+    """Drop-in replacement for app._firebase_auth."""
+    return FakeFirebaseAuth
+
+
+def app_config(database_url: str, **config: Any) -> Dict[str, Any]:
+    """create_app settings for `database_url` without the credentials check or rate limiting."""
+    settings = {
+        "SQLALCHEMY_DATABASE_URI": database_url,
+        "REQUIRE_FIREBASE_CREDENTIALS": False,
+        "RATE_LIMIT_ENABLED": False,
+    }
+    settings.update(config)
+    return settings
+
+
+def auth_headers(uid: str) -> Dict[str, str]:
+    """Headers that FakeFirebaseAuth resolves to `uid`."""
+    return {"Authorization": f"Bearer {uid}"}
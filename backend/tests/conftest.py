@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+# Add backend directory to path to import backend modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from database import db
+from testing import app_config, fake_firebase_auth
+
+
+@pytest.fixture
+def make_app(monkeypatch):
+    """Factory for apps on a private in-memory SQLite database with Firebase stubbed out."""
+    monkeypatch.setattr(app_module, "_firebase_auth", fake_firebase_auth)
+    apps = []
+
+    def factory(**config):
+        flask_app = app_module.create_app(app_config("sqlite://", **config))
+        apps.append(flask_app)
+        return flask_app
+
+    yield factory
+
+    for flask_app in apps:
+        with flask_app.app_context():
+            db.session.remove()
+            db.drop_all()
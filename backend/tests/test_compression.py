@@ -0,0 +1,58 @@
+import datetime as dt
+import gzip
+import json
+
+import pytest
+
+from database import db
+from models import Gender, Match, UserProfile
+from testing import auth_headers
+
+
+@pytest.fixture
+def client(make_app):
+    flask_app = make_app()
+    with flask_app.app_context():
+        db.session.add(UserProfile(
+            uid="u1", email="u1@test.local", first_name="Test", last_name="u1",
+            birth_date=dt.date(1990, 1, 1), gender=Gender.other,
+        ))
+        for i in range(20):
+            db.session.add(Match(
+                id=f"m{i}", user_id="u1", date=dt.datetime(2024, 1, 1 + i), picture="p", notes="A long match note",
+            ))
+        db.session.commit()
+    return flask_app.test_client()
+
+
+def _matches(client, **headers):
+    return client.get("/api/matches", headers={**auth_headers("u1"), **headers})
+
+
+def test_large_json_is_gzipped_when_accepted(client):
+    response = _matches(client, **{"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    body = gzip.decompress(response.data)
+    assert len(body) >= 1024 > len(response.data)
+    assert len(json.loads(body)) == 20
+
+
+def test_without_accept_encoding_the_body_is_sent_as_is(client):
+    response = _matches(client)
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(response.get_json()) == 20
+
+
+def test_unsupported_encodings_fall_back_to_identity(client):
+    response = _matches(client, **{"Accept-Encoding": "compress"})
+    assert "Content-Encoding" not in response.headers
+    assert len(response.get_json()) == 20
+
+
+def test_bodies_below_the_threshold_are_not_compressed(client):
+    response = client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.get_json() == {"status": "ok"}
@@ -0,0 +1,84 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy import event
+
+from database import db
+from models import Follow, Gender, Match, UserProfile
+from testing import auth_headers
+
+
+@pytest.fixture
+def flask_app(make_app):
+    flask_app = make_app()
+    with flask_app.app_context():
+        for uid in ("reader", "author"):
+            db.session.add(UserProfile(
+                uid=uid, email=f"{uid}@test.local", first_name="First", last_name=uid,
+                birth_date=dt.date(1990, 1, 1), gender=Gender.other, profile_picture="pic",
+            ))
+        db.session.add(Follow(follower_id="reader", following_id="author"))
+        db.session.add(Match(
+            id="m1", user_id="author", date=dt.datetime(2024, 1, 1), is_victory=True, picture="p", notes="secret",
+        ))
+        db.session.commit()
+    return flask_app
+
+
+@pytest.fixture
+def statements(flask_app):
+    """SQL statements run while the test issues requests."""
+    executed = []
+    with flask_app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def _get(flask_app, path, uid="reader"):
+    return flask_app.test_client().get(path, headers=auth_headers(uid))
+
+
+@pytest.mark.parametrize("path, error", [
+    ("/api/matches?fields=id,bogus", "Unknown fields: bogus"),
+    ("/api/profiles/me?fields=userId,password", "Unknown fields: password"),
+    ("/api/feed?fields=id,user.email", "Unknown fields: user.email"),
+])
+def test_unknown_fields_return_400(flask_app, path, error):
+    response = _get(flask_app, path)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+
+def test_matches_are_projected_to_the_requested_fields(flask_app, statements):
+    response = _get(flask_app, "/api/matches/user/author?fields=id,isVictory")
+    assert response.get_json() == [{"id": "m1", "isVictory": True}]
+
+    match_queries = [s for s in statements if "FROM matches" in s]
+    assert match_queries and not any("notes" in s for s in match_queries)
+
+
+def test_profile_fields(flask_app):
+    response = _get(flask_app, "/api/profiles/author?fields=firstName,profilePicture")
+    assert response.get_json() == {"firstName": "First", "profilePicture": "pic"}
+
+
+def test_feed_user_prefix_selects_user_keys_and_columns(flask_app, statements):
+    response = _get(flask_app, "/api/feed?fields=id,user.userId")
+    assert response.get_json() == [{"match": {"id": "m1"}, "user": {"userId": "author"}}]
+
+    profile_queries = [s for s in statements if "FROM user_profiles" in s]
+    assert profile_queries and not any("first_name" in s or "profile_picture" in s for s in profile_queries)
+
+
+def test_feed_without_user_fields_returns_the_whole_user_block(flask_app):
+    response = _get(flask_app, "/api/feed?fields=isVictory")
+    assert response.get_json() == [{
+        "match": {"isVictory": True},
+        "user": {"userId": "author", "displayName": "First author", "profilePicture": "pic"},
+    }]
@@ -0,0 +1,121 @@
+import datetime as dt
+import random
+
+import leaderboard
+from database import db
+from models import Gender, Match, PlayerStats, UserProfile
+from testing import auth_headers
+
+PLAYERS = ["p1", "p2", "p3", "p4"]
+
+
+def _seed_profiles():
+    for uid in PLAYERS:
+        db.session.add(UserProfile(
+            uid=uid, email=f"{uid}@test.local", first_name="Test", last_name=uid,
+            birth_date=dt.date(1990, 1, 1), gender=Gender.other,
+        ))
+    db.session.commit()
+
+
+def _rollup():
+    return {stats.user_id: stats.to_dict() for stats in PlayerStats.query.order_by(PlayerStats.user_id)}
+
+
+def test_incremental_updates_match_full_refresh(make_app):
+    rng = random.Random(7)
+    with make_app().app_context():
+        _seed_profiles()
+        live = []
+        for i in range(200):
+            if live and rng.random() < 0.3:
+                match = live.pop(rng.randrange(len(live)))
+                user_id, is_victory = match.user_id, match.is_victory
+                db.session.delete(match)
+                leaderboard.remove_match(user_id, is_victory)
+            else:
+                match = Match(
+                    id=f"m{i}", user_id=rng.choice(PLAYERS), is_victory=rng.random() < 0.5,
+                    date=dt.datetime(2024, 1, 1) + dt.timedelta(hours=rng.randrange(100000)), picture="p",
+                )
+                db.session.add(match)
+                leaderboard.record_match(match)
+                live.append(match)
+            db.session.commit()
+
+            if i % 50 == 49:
+                incremental = _rollup()
+                leaderboard.refresh_all()
+                assert incremental == _rollup()
+
+
+def test_player_whose_matches_are_all_deleted_leaves_the_rollup(make_app):
+    with make_app().app_context():
+        _seed_profiles()
+        match = Match(id="m1", user_id="p1", is_victory=True, date=dt.datetime(2024, 1, 1), picture="p")
+        db.session.add(match)
+        leaderboard.record_match(match)
+        db.session.commit()
+        assert "p1" in _rollup()
+
+        db.session.delete(match)
+        leaderboard.remove_match("p1", True)
+        db.session.commit()
+        incremental = _rollup()
+        leaderboard.refresh_all()
+        assert incremental == _rollup() == {}
+
+
+def test_init_db_backfills_a_missing_rollup(make_app):
+    flask_app = make_app()
+    with flask_app.app_context():
+        _seed_profiles()
+        db.session.add(Match(id="m1", user_id="p2", is_victory=False, date=dt.datetime(2024, 1, 1), picture="p"))
+        db.session.commit()
+        assert _rollup() == {}
+
+        result = flask_app.test_cli_runner().invoke(args=["init-db"])
+        assert result.exit_code == 0, result.output
+        assert _rollup()["p2"]["matchesPlayed"] == 1
+
+
+def test_leaderboard_endpoints_rank_players(make_app):
+    flask_app = make_app()
+    client = flask_app.test_client()
+    with flask_app.app_context():
+        _seed_profiles()
+    for uid, outcomes in (("p1", [True, False]), ("p2", [True]), ("p3", [False]), ("p4", [True, True])):
+        for day, is_victory in enumerate(outcomes, start=1):
+            response = client.post(
+                "/api/matches",
+                json={"date": f"2024-01-0{day}T10:00:00", "picture": "p", "isVictory": is_victory},
+                headers=auth_headers(uid),
+            )
+            assert response.status_code == 200
+
+    body = client.get("/api/leaderboard?limit=2", headers=auth_headers("p3")).get_json()
+    assert [(e["userId"], e["rank"]) for e in body["entries"]] == [("p4", 1), ("p2", 2)]
+    assert (body["me"]["userId"], body["me"]["rank"]) == ("p3", 4)
+
+
+def test_first_match_upsert_survives_a_concurrent_insert(make_app, monkeypatch):
+    with make_app().app_context():
+        _seed_profiles()
+        player_totals = leaderboard._player_totals
+
+        def insert_row_first(user_id):
+            # Another worker commits this player's first match between our UPDATE and INSERT
+            db.session.add(Match(id="other", user_id=user_id, is_victory=False, date=dt.datetime(2024, 1, 1), picture="p"))
+            db.session.add(PlayerStats(user_id=user_id, matches_played=1, victories=0, win_rate=0.0, recent_form="L"))
+            db.session.flush()
+            return player_totals(user_id)
+
+        monkeypatch.setattr(leaderboard, "_player_totals", insert_row_first)
+        match = Match(id="mine", user_id="p1", is_victory=True, date=dt.datetime(2024, 1, 2), picture="p")
+        db.session.add(match)
+        leaderboard.record_match(match)
+        db.session.commit()
+
+        db.session.expire_all()
+        stats = db.session.get(PlayerStats, "p1")
+        assert (stats.matches_played, stats.victories, stats.win_rate) == (2, 1, 0.5)
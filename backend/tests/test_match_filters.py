@@ -0,0 +1,73 @@
+import datetime as dt
+
+import pytest
+
+from database import db
+from models import Gender, Match, UserProfile
+from testing import auth_headers
+
+# (id, date, is_victory)
+MATCHES = [
+    ("m1", dt.datetime(2024, 12, 30, 18, 0), True),
+    ("m2", dt.datetime(2024, 12, 31, 9, 0), False),
+    ("m3", dt.datetime(2024, 12, 31, 21, 0), True),
+    ("m4", dt.datetime(2025, 1, 1, 10, 0), False),
+]
+
+
+@pytest.fixture
+def client(make_app):
+    flask_app = make_app()
+    with flask_app.app_context():
+        db.session.add(UserProfile(
+            uid="p1", email="p1@test.local", first_name="Test", last_name="p1",
+            birth_date=dt.date(1990, 1, 1), gender=Gender.other,
+        ))
+        for match_id, date, is_victory in MATCHES:
+            db.session.add(Match(id=match_id, user_id="p1", date=date, is_victory=is_victory, picture="p"))
+        db.session.commit()
+    return flask_app.test_client()
+
+
+def _match_ids(client, path, query):
+    response = client.get(f"{path}?{query}", headers=auth_headers("p1"))
+    assert response.status_code == 200
+    return [match["id"] for match in response.get_json()]
+
+
+@pytest.mark.parametrize("path", ["/api/matches", "/api/matches/user/p1"])
+@pytest.mark.parametrize("query, expected", [
+    ("", ["m1", "m2", "m3", "m4"]),
+    ("from=2024-12-31", ["m2", "m3", "m4"]),
+    ("to=2024-12-31", ["m1", "m2", "m3"]),
+    ("from=2024-12-31&to=2024-12-31", ["m2", "m3"]),
+    ("to=2024-12-31T21:00:00", ["m1", "m2"]),
+    ("from=2024-12-31T09:00:00Z", ["m2", "m3", "m4"]),
+    ("isVictory=true", ["m1", "m3"]),
+    ("isVictory=0&from=2024-12-31", ["m2", "m4"]),
+])
+def test_match_lists_filter_by_date_and_outcome(client, path, query, expected):
+    assert sorted(_match_ids(client, path, query)) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("", [True, False, True, False]),
+    ("to=2024-12-31", [True, False, True]),
+    ("from=2024-12-31&isVictory=false", [False, False]),
+])
+def test_match_results_filter_by_date_and_outcome(client, query, expected):
+    response = client.get(f"/api/match-results/p1?{query}")
+    assert response.status_code == 200
+    assert response.get_json() == expected
+
+
+@pytest.mark.parametrize("path", ["/api/matches", "/api/matches/user/p1", "/api/match-results/p1"])
+@pytest.mark.parametrize("query, error", [
+    ("from=yesterday", "from must be an ISO date or datetime"),
+    ("to=2024-13-01", "to must be an ISO date or datetime"),
+    ("isVictory=maybe", "isVictory must be true or false"),
+])
+def test_bad_filters_return_400(client, path, query, error):
+    response = client.get(f"{path}?{query}", headers=auth_headers("p1"))
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
@@ -0,0 +1,126 @@
+import pytest
+
+from rate_limit import Budget, MemoryBackend, RateLimitBackend, RateLimiter
+from testing import auth_headers
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_starts_full_and_refills_at_rate():
+    clock = FakeClock()
+    backend = MemoryBackend(clock=clock)
+    budget = Budget(rate=1.0, capacity=2)
+
+    assert backend.take("k", budget) == 0
+    assert backend.take("k", budget) == 0
+    assert backend.take("k", budget) == pytest.approx(1.0)
+
+    clock.now = 0.5
+    assert backend.take("k", budget) == pytest.approx(0.5)
+    clock.now = 1.0
+    assert backend.take("k", budget) == 0
+
+
+def test_refill_is_capped_at_capacity():
+    clock = FakeClock()
+    backend = MemoryBackend(clock=clock)
+    budget = Budget(rate=1.0, capacity=2)
+    backend.take("k", budget)
+    backend.take("k", budget)
+
+    clock.now = 100.0
+    assert backend.take("k", budget) == 0
+    assert backend.take("k", budget) == 0
+    assert backend.take("k", budget) > 0
+
+
+def test_cost_larger_than_available_tokens_reports_wait():
+    backend = MemoryBackend(clock=FakeClock())
+    budget = Budget(rate=2.0, capacity=3)
+    assert backend.take("k", budget, cost=2) == 0
+    # one token left, three needed: two more at 2 tokens/s
+    assert backend.take("k", budget, cost=3) == pytest.approx(1.0)
+
+
+def test_memory_backend_evicts_least_recently_used_keys():
+    backend = MemoryBackend(max_keys=3, clock=FakeClock())
+    budget = Budget(rate=1.0, capacity=5)
+    for i in range(10):
+        backend.take(f"k{i}", budget)
+        if i >= 1:
+            backend.take("k0", budget)  # keep k0 recently used
+
+    assert list(backend._buckets) == ["k8", "k9", "k0"]
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+def test_user_over_budget_does_not_drain_global_bucket():
+    limiter = RateLimiter(
+        backend=MemoryBackend(clock=FakeClock()),
+        user_budgets={"route": Budget(rate=1.0, capacity=1)},
+        global_budgets={"route": Budget(rate=1.0, capacity=2)},
+    )
+    assert limiter.check("route", "greedy") == 0
+    for _ in range(5):
+        assert limiter.check("route", "greedy") > 0
+
+    assert limiter.check("route", "other") == 0
+
+
+def test_feed_returns_429_with_retry_after_after_burst(make_app):
+    client = make_app(RATE_LIMIT_ENABLED=True).test_client()
+
+    for _ in range(10):
+        assert client.get("/api/feed", headers=auth_headers("u1")).status_code == 200
+
+    response = client.get("/api/feed", headers=auth_headers("u1"))
+    assert response.status_code == 429
+    assert response.get_json() == {"error": "Too many requests"}
+    # get_feed refills 0.5 tokens/s, so one token is about 2 s away
+    assert response.headers["Retry-After"] == "2"
+
+    # other users keep their own bucket
+    assert client.get("/api/feed", headers=auth_headers("u2")).status_code == 200
+
+
+class RecordingBackend(RateLimitBackend):
+    def __init__(self):
+        self.keys = []
+
+    def take(self, key, budget, cost=1.0):
+        self.keys.append(key)
+        return 0.0
+
+
+def test_backend_is_selected_through_config(make_app):
+    backend = RecordingBackend()
+    client = make_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_BACKEND=backend).test_client()
+    client.get("/api/feed", headers=auth_headers("u1"))
+    assert backend.keys == ["user:u1:get_feed", "global:get_feed"]
+
+    flask_app = make_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_BACKEND="rate_limit:MemoryBackend")
+    assert isinstance(flask_app.extensions["rate_limiter"].backend, MemoryBackend)
+
+    with pytest.raises(TypeError):
+        make_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_BACKEND="collections:OrderedDict")
+
+
+def test_match_results_are_limited_per_ip(make_app):
+    client = make_app(RATE_LIMIT_ENABLED=True).test_client()
+
+    for _ in range(20):
+        assert client.get("/api/match-results/u1").status_code == 200
+    assert client.get("/api/match-results/u1").status_code == 429
+
+    other_ip = {"REMOTE_ADDR": "10.0.0.2"}
+    assert client.get("/api/match-results/u1", environ_base=other_ip).status_code == 200
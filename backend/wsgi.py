@@ -0,0 +1,8 @@
+"""WSGI entrypoint: point the server (PythonAnywhere, gunicorn, ...) at `wsgi:app`.
+
+Workers skip the schema check at boot; run `flask --app wsgi init-db` once per
+deploy to create new tables and indexes.
+"""
+from app import create_app
+
+app = create_app({"AUTO_CREATE_TABLES": False})